@@ -6,12 +6,91 @@ Pings 8.8.8.8 and logs results with packet loss statistics.
 
 import subprocess
 import re
+import os
+import select
+import selectors
+import socket
+import struct
+import time
 from datetime import datetime
-import signal
 import sys
+import queue
+import threading
+import math
+import random
 import statistics
+from array import array
 from collections import defaultdict
 
+# Classifies a line of ping output (raw bytes) in a single pass: any match
+# is a sent packet, and a captured 'lat' group means a reply was received.
+_LINE_RE = re.compile(
+    rb'icmp_seq(?:.*time ?=\s*(?P<lat>\d+\.?\d*)\s*ms)?'
+    rb'|(?i:timeout)'
+)
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP_PAYLOAD = bytes(56)  # Same size as ping's default
+PING_INTERVAL = 1.0  # Seconds between echo requests
+PING_REPLY_TIMEOUT = 10.0  # Seconds to wait for a reply before counting the packet lost
+PING_SILENCE_WARNING = 10.0  # Seconds of no ping output between warnings
+PING_READ_SIZE = 64 * 1024  # Max bytes taken from ping's pipe per read
+
+_BAR = '=' * 60
+_FILENAME_SAFE = str.maketrans('.:', '__')  # IPv4 dots and IPv6 colons
+
+LATENCY_RESERVOIR_SIZE = 10000  # Latency samples kept for percentiles
+
+LOG_BUFFER_SIZE = 64 * 1024
+LOG_FLUSH_INTERVAL = 1.0  # Seconds between log file flushes
+LOG_SYNC_INTERVAL = 60.0  # Seconds between forcing the log file to disk
+LOG_QUEUE_SIZE = 10000  # Lines buffered for the writer thread
+LOG_CLOSE_TIMEOUT = 5.0  # Seconds to wait for the writer thread on close
+
+# macOS has no fdatasync; a full fsync is the closest equivalent there
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+def icmp_checksum(data):
+    """RFC 1071 internet checksum."""
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+def parse_echo_reply(buf, n):
+    """Return (identifier, seq, ICMP length) if buf[:n] is an echo reply, else None."""
+    # Linux strips the IP header from ICMP datagram sockets; macOS doesn't
+    offset = (buf[0] & 0x0f) * 4 if n and buf[0] >> 4 == 4 else 0
+    if n - offset < 8:
+        return None
+    icmp_type, _, _, ident, seq = struct.unpack_from('!BBHHH', buf, offset)
+    if icmp_type != ICMP_ECHO_REPLY:
+        return None
+    return ident, seq, n - offset
+
+class RunningStats:
+    """Mean and sample stdev of a latency stream in O(1) memory (Welford's algorithm)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def stdev(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0
+
 class PacketLossMonitor:
     def __init__(self, target="8.8.8.8"):
         self.target = target
@@ -19,12 +98,16 @@ class PacketLossMonitor:
         self.packets_received = 0
         self.window_sent = 0  # Packets sent in current 100-packet window
         self.window_received = 0  # Packets received in current 100-packet window
+        self._to_next_summary = 100  # Packets left until the window summary
 
         # Latency tracking
-        self.latencies = []  # All latencies for overall average
-        self.window_latencies = []  # Latencies for current 100-packet window
+        self.latencies = RunningStats()  # All latencies for overall average
+        self.window_latencies = RunningStats()  # Latencies for current 100-packet window
         self.min_latency = None
         self.max_latency = None
+        # Uniform sample of all latencies (Algorithm R), so percentiles stay cheap on long runs
+        self._reservoir = array('d', [0.0]) * LATENCY_RESERVOIR_SIZE
+        self._reservoir_seen = 0
         self.max_window_loss_pct = 0.0  # Worst packet loss in any 100-packet window
         self.start_time = None  # Track when monitoring started
 
@@ -32,11 +115,29 @@ class PacketLossMonitor:
         self.hourly_stats = defaultdict(lambda: {
             'sent': 0,
             'received': 0,
-            'latencies': []
+            'latencies': RunningStats()
         })
+        self._bucket_key = None  # Hour key of the cached bucket below
+        self._bucket = None
+
+        # Formatted timestamps cached per wall-clock second
+        self._last_sec = -1
+        self._last_ts = ''
+        self._last_hour = ''
+
+        self.target_addr = None  # Resolved IPv4 address when using an ICMP socket
+        self._recv_buf = bytearray(2048)  # Reused for every ICMP reply
+        self.icmp_ident = os.getpid() & 0xffff
+        # Linux rewrites the identifier and only delivers this socket's own
+        # replies; elsewhere (macOS) every ping process's replies arrive here
+        self._check_ident = not sys.platform.startswith('linux')
+        self._outstanding = {}  # seq -> send time (perf_counter_ns), oldest first
 
-        self.log_filename = f"ping_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.target.replace('.', '_')}.txt"
+        self.log_filename = f"ping_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.target.translate(_FILENAME_SAFE)}.txt"
         self.log_file = None
+        self._log_queue = None
+        self._log_thread = None
+        self._log_error = None  # Exception that stopped the writer thread, until reported
 
     def calculate_loss_percentage(self):
         if self.packets_sent == 0:
@@ -45,153 +146,427 @@ class PacketLossMonitor:
 
     def print_summary(self):
         loss_pct = self.calculate_loss_percentage()
-        avg_latency = sum(self.latencies) / len(self.latencies) if self.latencies else 0
-        jitter = statistics.stdev(self.latencies) if len(self.latencies) > 1 else 0
+        avg_latency = self.latencies.mean
+        jitter = self.latencies.stdev()
 
         end_time = datetime.now()
         start_str = self.start_time.strftime('%Y-%m-%d %H:%M:%S') if self.start_time else "N/A"
         end_str = end_time.strftime('%Y-%m-%d %H:%M:%S')
-        summary = f"\n{'='*60}\nOVERALL SUMMARY {start_str} to {end_str}\n{'='*60}\n"
-        summary += f"Total packets sent: {self.packets_sent}\n"
-        summary += f"Total packets received: {self.packets_received}\n"
-        summary += f"Packet loss: {loss_pct:.2f}%\n"
-        summary += f"Max packet loss (In any 100 packet window): {self.max_window_loss_pct:.2f}%\n"
-        summary += f"\nLatency statistics:\n"
-        summary += f"  Average: {avg_latency:.2f} ms\n"
-        summary += f"  Minimum: {self.min_latency:.2f} ms\n" if self.min_latency is not None else "  Minimum: N/A\n"
-        summary += f"  Maximum: {self.max_latency:.2f} ms\n" if self.max_latency is not None else "  Maximum: N/A\n"
-        summary += f"  Jitter (stdev): {jitter:.2f} ms\n"
+        parts = [f"\n{_BAR}\nOVERALL SUMMARY {start_str} to {end_str}\n{_BAR}\n"]
+        parts.append(f"Total packets sent: {self.packets_sent}\n")
+        parts.append(f"Total packets received: {self.packets_received}\n")
+        parts.append(f"Packet loss: {loss_pct:.2f}%\n")
+        parts.append(f"Max packet loss (In any 100 packet window): {self.max_window_loss_pct:.2f}%\n")
+        parts.append(f"\nLatency statistics:\n")
+        parts.append(f"  Average: {avg_latency:.2f} ms\n")
+        parts.append(f"  Minimum: {self.min_latency:.2f} ms\n" if self.min_latency is not None else "  Minimum: N/A\n")
+        parts.append(f"  Maximum: {self.max_latency:.2f} ms\n" if self.max_latency is not None else "  Maximum: N/A\n")
+        parts.append(f"  Jitter (stdev): {jitter:.2f} ms\n")
+        samples = self._reservoir[:min(self._reservoir_seen, LATENCY_RESERVOIR_SIZE)]
+        if len(samples) > 1:
+            pcts = statistics.quantiles(samples, n=100, method='inclusive')
+            parts.append(f"  Percentiles: p50 {pcts[49]:.2f} ms, p95 {pcts[94]:.2f} ms, p99 {pcts[98]:.2f} ms\n")
+        else:
+            parts.append("  Percentiles: N/A\n")
 
         # Hourly breakdown
         if self.hourly_stats:
-            summary += f"\n{'='*60}\nHOURLY BREAKDOWN\n{'='*60}\n"
+            parts.append(f"\n{_BAR}\nHOURLY BREAKDOWN\n{_BAR}\n")
             for hour in sorted(self.hourly_stats.keys()):
                 stats = self.hourly_stats[hour]
                 sent = stats['sent']
                 received = stats['received']
                 loss = ((sent - received) / sent * 100) if sent > 0 else 0
-                avg_lat = sum(stats['latencies']) / len(stats['latencies']) if stats['latencies'] else 0
-                hour_jitter = statistics.stdev(stats['latencies']) if len(stats['latencies']) > 1 else 0
+                avg_lat = stats['latencies'].mean
+                hour_jitter = stats['latencies'].stdev()
 
-                summary += f"\n{hour}\n"
-                summary += f"  Packets: {received}/{sent} received (loss: {loss:.2f}%)\n"
-                summary += f"  Latency: {avg_lat:.2f} ms avg, {hour_jitter:.2f} ms jitter\n"
+                parts.append(f"\n{hour}\n")
+                parts.append(f"  Packets: {received}/{sent} received (loss: {loss:.2f}%)\n")
+                parts.append(f"  Latency: {avg_lat:.2f} ms avg, {hour_jitter:.2f} ms jitter\n")
 
-        summary += f"\n{'='*60}\n"
-        summary += f"Log file: {self.log_filename}\n"
-        summary += f"{'='*60}\n"
+        parts.append(f"\n{_BAR}\n")
+        parts.append(f"Log file: {self.log_filename}\n")
+        parts.append(f"{_BAR}\n")
+        summary = ''.join(parts)
         print(summary)
         if self.log_file:
-            self.log_file.write(summary)
-            self.log_file.flush()
+            self._write_log(summary)
+
+    def timestamps(self):
+        """Return (timestamp, hour_key) for now, reformatting at most once per second."""
+        sec = int(time.time())
+        if sec != self._last_sec:
+            self._last_sec = sec
+            self._last_ts = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sec))
+            self._last_hour = self._last_ts[:14] + '00'  # Group by hour
+        return self._last_ts, self._last_hour
 
     def log(self, message):
         """Write to both console and file."""
-        print(message)
+        text = message + "\n"
+        sys.stdout.write(text)
         if self.log_file:
-            self.log_file.write(message + "\n")
-            self.log_file.flush()
+            self._write_log(text)
 
-    def run(self):
-        # Set up signal handler for clean exit
-        def signal_handler(sig, frame):
-            self.print_summary()
-            if self.log_file:
-                self.log_file.close()
-            sys.exit(0)
+    def _write_log(self, text):
+        """Hand text to the writer thread, waiting if it has fallen behind.
 
-        signal.signal(signal.SIGINT, signal_handler)
+        Only the writer thread touches the file while it's alive, so lines stay
+        in order; once it has died they're written inline instead.
+        """
+        self._raise_log_error()
+        while self._log_thread.is_alive():
+            try:
+                self._log_queue.put(text, timeout=LOG_FLUSH_INTERVAL)
+                return
+            except queue.Full:
+                pass
+        self._raise_log_error()
+        self._drain_log_queue()
+        self.log_file.write(text)
 
-        # Record start time
-        self.start_time = datetime.now()
+    def _drain_log_queue(self):
+        """Write out lines the writer thread didn't get to before it stopped."""
+        while True:
+            try:
+                text = self._log_queue.get_nowait()
+            except queue.Empty:
+                return
+            if text is not None:
+                self.log_file.write(text)
 
-        # Open log file
-        self.log_file = open(self.log_filename, 'w')
+    def _raise_log_error(self):
+        """Re-raise, once, the exception that stopped the writer thread."""
+        if self._log_error is not None:
+            error, self._log_error = self._log_error, None
+            raise error
 
-        # Log header
-        header = f"Packet Loss Monitor - Started {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}"
-        self.log(f"{'='*60}")
-        self.log(header)
-        self.log(f"Target: {self.target}")
-        self.log(f"{'='*60}\n")
+    def _log_writer(self):
+        """Writer thread: drain the queue into the log file, flushing once per interval."""
+        log_file = self.log_file  # close_log() may drop self.log_file if we stall
+        next_flush = time.monotonic() + LOG_FLUSH_INTERVAL
+        next_sync = time.monotonic() + LOG_SYNC_INTERVAL
+        try:
+            while True:
+                try:
+                    text = self._log_queue.get(timeout=LOG_FLUSH_INTERVAL)
+                except queue.Empty:
+                    text = ''
+                if text is None:
+                    break
+                if text:
+                    log_file.write(text)
+                now = time.monotonic()
+                if now >= next_sync:
+                    self._sync_log(log_file)
+                    next_sync = now + LOG_SYNC_INTERVAL
+                    next_flush = now + LOG_FLUSH_INTERVAL
+                elif now >= next_flush:
+                    log_file.flush()
+                    next_flush = now + LOG_FLUSH_INTERVAL
+        except Exception as e:
+            # e.g. disk full; surfaced on the main thread by the next log write
+            self._log_error = e
+
+    @staticmethod
+    def _sync_log(log_file):
+        """Flush and force the log file's data (not metadata) to disk."""
+        log_file.flush()
+        _fdatasync(log_file.fileno())
+
+    def open_log(self):
+        self.log_file = open(self.log_filename, 'w', buffering=LOG_BUFFER_SIZE)
+        self._log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._log_thread = threading.Thread(target=self._log_writer, daemon=True)
+        self._log_thread.start()
+
+    def close_log(self):
+        """Stop the writer thread once it has drained the queue, then close the file."""
+        if not self.log_file:
+            return
+        if self._log_thread.is_alive():
+            try:
+                self._log_queue.put(None, timeout=LOG_CLOSE_TIMEOUT)
+            except queue.Full:
+                pass
+            self._log_thread.join(LOG_CLOSE_TIMEOUT)
+        if self._log_thread.is_alive():
+            # Stuck (e.g. on a stalled disk); it still owns the file, so leave it be
+            self.log_file = None
+            print(f"Warning: log writer still busy after {LOG_CLOSE_TIMEOUT:.0f}s; "
+                  f"{self.log_filename} may be incomplete", file=sys.stderr)
+            return
+        try:
+            self._drain_log_queue()
+            self._sync_log(self.log_file)
+        finally:
+            self.log_file.close()
+            self.log_file = None
+        self._raise_log_error()
+
+    def record_packet(self, hour_key, latency):
+        """Count one sent packet; latency is the reply time in ms, or None if lost."""
+        # The hour rolls over rarely; skip the dict lookup otherwise
+        if hour_key != self._bucket_key:
+            self._bucket_key = hour_key
+            self._bucket = self.hourly_stats[hour_key]
+        bucket = self._bucket
+
+        self.packets_sent += 1
+        self.window_sent += 1
+        bucket['sent'] += 1
+
+        if latency is not None:
+            self.packets_received += 1
+            self.window_received += 1
+            bucket['received'] += 1
+
+            self.latencies.add(latency)
+            self.window_latencies.add(latency)
+            bucket['latencies'].add(latency)
+
+            seen = self._reservoir_seen
+            if seen < LATENCY_RESERVOIR_SIZE:
+                self._reservoir[seen] = latency
+            else:
+                j = random.randrange(seen + 1)
+                if j < LATENCY_RESERVOIR_SIZE:
+                    self._reservoir[j] = latency
+            self._reservoir_seen = seen + 1
+
+            # Track min/max
+            if self.min_latency is None or latency < self.min_latency:
+                self.min_latency = latency
+            if self.max_latency is None or latency > self.max_latency:
+                self.max_latency = latency
+
+        # Print periodic summary (every 100 packets)
+        self._to_next_summary -= 1
+        if self._to_next_summary == 0:
+            self._to_next_summary = 100
+            window_loss_pct = ((self.window_sent - self.window_received) / self.window_sent) * 100 if self.window_sent > 0 else 0
+            window_lost = self.window_sent - self.window_received
+            if window_loss_pct > self.max_window_loss_pct:
+                self.max_window_loss_pct = window_loss_pct
+            window_avg_latency = self.window_latencies.mean
+            window_jitter = self.window_latencies.stdev()
 
-        # Start ping process
+            stats = f"\n--- Statistics for packets {self.packets_sent - 99} to {self.packets_sent} ---"
+            stats += f"\nPacket loss: {window_loss_pct:.2f}% ({window_lost}/{self.window_sent} lost)"
+            stats += f"\nAverage latency: {window_avg_latency:.2f} ms"
+            stats += f"\nJitter (stdev): {window_jitter:.2f} ms\n"
+            self.log(stats)
+
+            # Reset window counters
+            self.window_sent = 0
+            self.window_received = 0
+            self.window_latencies.reset()
+
+    def open_icmp_socket(self):
+        """Return an unprivileged ICMP socket, or None if the OS doesn't allow one."""
+        try:
+            self.target_addr = socket.gethostbyname(self.target)
+            return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        except OSError:
+            return None
+
+    def ping_once(self, sock, seq):
+        """Send echo request seq, then handle replies until the next request is due.
+
+        Replies are credited to whichever outstanding request they answer, so a
+        reply slower than the interval still counts, with its real latency.
+        """
+        header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, self.icmp_ident, seq)
+        checksum = icmp_checksum(header + ICMP_PAYLOAD)
+        packet = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, self.icmp_ident, seq) + ICMP_PAYLOAD
+
+        t0 = time.perf_counter_ns()
+        try:
+            sock.sendto(packet, (self.target_addr, 0))
+        except OSError as e:
+            # e.g. network unreachable while the link is down
+            timestamp, hour_key = self.timestamps()
+            self.log(f"{timestamp} - ping: sendto: {e.strerror or e} (icmp_seq {seq})")
+            self.record_packet(hour_key, None)
+        else:
+            self._outstanding[seq] = t0
+        self.wait_for_replies(sock, t0 + int(PING_INTERVAL * 1e9))
+
+    def wait_for_replies(self, sock, deadline):
+        """Log and count echo replies until deadline (a perf_counter_ns value)."""
+        while True:
+            self.expire_requests()
+            remaining = deadline - time.perf_counter_ns()
+            if remaining <= 0:
+                return
+            if not select.select([sock], [], [], remaining / 1e9)[0]:
+                continue
+            try:
+                n = sock.recv_into(self._recv_buf)
+            except OSError as e:
+                # ICMP errors (e.g. host unreachable) are reported here on Linux;
+                # the request they belong to is counted when it times out
+                timestamp, _ = self.timestamps()
+                self.log(f"{timestamp} - ping: {e.strerror or e}")
+                continue
+            t1 = time.perf_counter_ns()
+
+            reply = parse_echo_reply(self._recv_buf, n)
+            if reply is None:
+                continue
+            ident, seq, size = reply
+            if self._check_ident and ident != self.icmp_ident:
+                continue  # Another process's ping
+            t0 = self._outstanding.pop(seq, None)
+            if t0 is None:
+                continue  # Duplicate, or already counted as lost
+            latency = (t1 - t0) / 1e6
+            timestamp, hour_key = self.timestamps()
+            self.log(f"{timestamp} - {size} bytes from {self.target_addr}: icmp_seq={seq} time={latency:.3f} ms")
+            self.record_packet(hour_key, latency)
+
+    def expire_requests(self):
+        """Count requests that have waited PING_REPLY_TIMEOUT without a reply as lost."""
+        cutoff = time.perf_counter_ns() - int(PING_REPLY_TIMEOUT * 1e9)
+        while self._outstanding:
+            seq, t0 = next(iter(self._outstanding.items()))  # Oldest first
+            if t0 > cutoff:
+                break
+            del self._outstanding[seq]
+            timestamp, hour_key = self.timestamps()
+            self.log(f"{timestamp} - Request timeout for icmp_seq {seq}")
+            self.record_packet(hour_key, None)
+
+    def run_socket(self, sock):
+        """Ping the target directly over an ICMP socket, once per interval."""
+        seq = 0
+        try:
+            while True:
+                self.ping_once(sock, seq)
+                seq = (seq + 1) & 0xffff
+        finally:
+            try:
+                self.abandon_requests()
+            finally:
+                sock.close()
+
+    def abandon_requests(self):
+        """Count requests still awaiting a reply at exit as sent and lost."""
+        while self._outstanding:
+            seq, _ = self._outstanding.popitem()
+            timestamp, hour_key = self.timestamps()
+            self.log(f"{timestamp} - No reply before exit for icmp_seq {seq}")
+            self.record_packet(hour_key, None)
+
+    def _process_line(self, line):
+        """Log one raw line of ping output and count it if it's a packet."""
+        line = line.strip()
+        if not line:
+            return
+
+        timestamp, hour_key = self.timestamps()
+        log_line = f"{timestamp} - {line.decode('ascii', 'replace')}"
+        self.log(log_line)
+
+        # Count packets and extract latency
+        match = _LINE_RE.search(line)
+        if match:
+            lat = match['lat']
+            self.record_packet(hour_key, float(lat) if lat is not None else None)
+
+    def run_ping(self):
+        """Fallback: run the system ping and parse its output."""
         ping_process = subprocess.Popen(
             ['ping', self.target],
             stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True
+            stderr=subprocess.STDOUT
         )
 
+        # Wait with a timeout so a total outage (ping prints nothing for lost
+        # packets on Linux) still shows up in the log
+        fd = ping_process.stdout.fileno()
+        os.set_blocking(fd, False)
+        sel = selectors.DefaultSelector()
+        sel.register(fd, selectors.EVENT_READ)
+        pending = b''
+        last_output = time.monotonic()
+        next_warning = PING_SILENCE_WARNING
+
         try:
-            for line in ping_process.stdout:
-                line = line.strip()
-                if not line:
+            while True:
+                if not sel.select(PING_INTERVAL):
+                    silent_for = time.monotonic() - last_output
+                    if silent_for >= next_warning:
+                        timestamp, _ = self.timestamps()
+                        self.log(f"{timestamp} - No output from ping for {silent_for:.0f}s")
+                        next_warning += PING_SILENCE_WARNING
                     continue
 
-                now = datetime.now()
-                timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
-                hour_key = now.strftime('%Y-%m-%d %H:00')  # Group by hour
-                log_line = f"{timestamp} - {line}"
-                self.log(log_line)
-
-                # Count packets and extract latency
-                if 'icmp_seq' in line or 'icmp_seq=' in line:
-                    self.packets_sent += 1
-                    self.window_sent += 1
-                    self.hourly_stats[hour_key]['sent'] += 1
-
-                    if 'time=' in line or 'time =' in line:
-                        self.packets_received += 1
-                        self.window_received += 1
-                        self.hourly_stats[hour_key]['received'] += 1
-
-                        # Extract latency
-                        time_match = re.search(r'time[=\s]+(\d+\.?\d*)\s*ms', line)
-                        if time_match:
-                            latency = float(time_match.group(1))
-                            self.latencies.append(latency)
-                            self.window_latencies.append(latency)
-                            self.hourly_stats[hour_key]['latencies'].append(latency)
-
-                            # Track min/max
-                            if self.min_latency is None or latency < self.min_latency:
-                                self.min_latency = latency
-                            if self.max_latency is None or latency > self.max_latency:
-                                self.max_latency = latency
-
-                elif 'Request timeout' in line or 'timeout' in line.lower():
-                    self.packets_sent += 1
-                    self.window_sent += 1
-                    self.hourly_stats[hour_key]['sent'] += 1
-
-                # Print periodic summary (every 100 packets)
-                if self.packets_sent > 0 and self.packets_sent % 100 == 0:
-                    window_loss_pct = ((self.window_sent - self.window_received) / self.window_sent) * 100 if self.window_sent > 0 else 0
-                    window_lost = self.window_sent - self.window_received
-                    if window_loss_pct > self.max_window_loss_pct:
-                        self.max_window_loss_pct = window_loss_pct
-                    window_avg_latency = sum(self.window_latencies) / len(self.window_latencies) if self.window_latencies else 0
-                    window_jitter = statistics.stdev(self.window_latencies) if len(self.window_latencies) > 1 else 0
-
-                    stats = f"\n--- Statistics for packets {self.packets_sent - 99} to {self.packets_sent} ---"
-                    stats += f"\nPacket loss: {window_loss_pct:.2f}% ({window_lost}/{self.window_sent} lost)"
-                    stats += f"\nAverage latency: {window_avg_latency:.2f} ms"
-                    stats += f"\nJitter (stdev): {window_jitter:.2f} ms\n"
-                    self.log(stats)
-
-                    # Reset window counters
-                    self.window_sent = 0
-                    self.window_received = 0
-                    self.window_latencies = []
+                # Drain whatever is buffered in the pipe, then split it into
+                # lines ourselves: one read per burst rather than per line
+                data = pending
+                eof = False
+                while True:
+                    try:
+                        chunk = os.read(fd, PING_READ_SIZE)
+                    except BlockingIOError:
+                        break
+                    if not chunk:
+                        eof = True  # ping exited
+                        break
+                    data += chunk
+                    if len(chunk) < PING_READ_SIZE:
+                        break
 
+                if len(data) > len(pending):
+                    last_output = time.monotonic()
+                    next_warning = PING_SILENCE_WARNING
+                if eof:
+                    lines, pending = data.split(b'\n'), b''
+                else:
+                    *lines, pending = data.split(b'\n')
+
+                for line in lines:
+                    self._process_line(line)
+
+                if eof:
+                    break
+        finally:
+            sel.close()
+            ping_process.terminate()
+            ping_process.stdout.close()
+            ping_process.wait()
+
+    def run(self):
+        # Record start time
+        self.start_time = datetime.now()
+
+        # Open log file
+        self.open_log()
+
+        # Log header
+        header = f"Packet Loss Monitor - Started {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}"
+        self.log(_BAR)
+        self.log(header)
+        self.log(f"Target: {self.target}")
+        self.log(f"{_BAR}\n")
+
+        try:
+            # Prefer pinging over our own socket; fall back to the ping binary
+            sock = self.open_icmp_socket()
+            if sock is not None:
+                self.run_socket(sock)
+            else:
+                self.run_ping()
+        except KeyboardInterrupt:
+            pass  # Ctrl+C: stop and print the summary below
         except Exception as e:
             self.log(f"\nError: {e}")
         finally:
-            ping_process.terminate()
-            self.print_summary()
-            if self.log_file:
-                self.log_file.close()
+            try:
+                self.print_summary()
+            finally:
+                self.close_log()
 
 if __name__ == "__main__":
     target = sys.argv[1] if len(sys.argv) > 1 else "8.8.8.8"
@@ -0,0 +1,570 @@
+import errno
+import io
+import os
+import random
+import select
+import socket
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import monitor_packet_loss as mpl
+
+
+class FailingFile:
+    """Log file stand-in whose writes fail as if the disk were full."""
+
+    def __init__(self, real):
+        self.real = real
+
+    def write(self, text):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    def flush(self):
+        pass
+
+    def fileno(self):
+        return self.real.fileno()
+
+    def close(self):
+        self.real.close()
+
+
+class GatedFile:
+    """Log file stand-in whose writes wait for a gate, recording the writing thread."""
+
+    def __init__(self, real):
+        self.real = real
+        self.gate = threading.Event()
+        self.writers = set()
+        self.closed = False
+
+    def write(self, text):
+        self.gate.wait()
+        self.writers.add(threading.current_thread())
+        return self.real.write(text)
+
+    def flush(self):
+        self.real.flush()
+
+    def fileno(self):
+        return self.real.fileno()
+
+    def close(self):
+        self.closed = True
+        self.real.close()
+
+
+def echo_reply(seq, ident=0, ip_header=False, icmp_type=mpl.ICMP_ECHO_REPLY):
+    """Bytes of an echo reply as an ICMP datagram socket would return them."""
+    icmp = struct.pack('!BBHHH', icmp_type, 0, 0, ident, seq) + mpl.ICMP_PAYLOAD
+    if ip_header:
+        # macOS hands back the IPv4 header too (version 4, 20-byte header)
+        icmp = b'\x45' + bytes(19) + icmp
+    return icmp
+
+
+class FakeSocket:
+    """ICMP socket stand-in backed by a socketpair, so select() works on it."""
+
+    def __init__(self, respond=None, send_error=None):
+        self._rx, self._tx = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.respond = respond  # packet -> list of replies to deliver
+        self.send_error = send_error
+        self.sent = []
+
+    def fileno(self):
+        return self._rx.fileno()
+
+    def sendto(self, packet, addr):
+        if self.send_error:
+            raise self.send_error
+        self.sent.append(packet)
+        if self.respond:
+            for reply in self.respond(packet):
+                self.deliver(reply)
+
+    def deliver(self, data):
+        self._tx.send(data)
+
+    def recv_into(self, buf):
+        return self._rx.recv_into(buf)
+
+    def close(self):
+        self._rx.close()
+        self._tx.close()
+
+
+def answer(packet):
+    """Reply to a request the way Linux does: same seq, no IP header."""
+    _, _, _, ident, seq = struct.unpack_from('!BBHHH', packet)
+    return [echo_reply(seq, ident)]
+
+
+class IcmpChecksumTest(unittest.TestCase):
+    def test_known_value(self):
+        # Echo request, id 0x1234, seq 1, no payload
+        self.assertEqual(mpl.icmp_checksum(b'\x08\x00\x00\x00\x12\x34\x00\x01'), 0xe5ca)
+
+    def test_packet_with_checksum_verifies(self):
+        data = b'\x08\x00\x00\x00\x00\x07\x00\x09odd'
+        checksum = mpl.icmp_checksum(data)
+        packet = data[:2] + struct.pack('!H', checksum) + data[4:]
+        self.assertEqual(mpl.icmp_checksum(packet), 0)
+
+
+class ParseEchoReplyTest(unittest.TestCase):
+    def parse(self, data):
+        buf = bytearray(2048)
+        buf[:len(data)] = data
+        return mpl.parse_echo_reply(buf, len(data))
+
+    def test_without_ip_header(self):
+        self.assertEqual(self.parse(echo_reply(7, ident=42)), (42, 7, 64))
+
+    def test_with_ip_header(self):
+        self.assertEqual(self.parse(echo_reply(7, ident=42, ip_header=True)), (42, 7, 64))
+
+    def test_ignores_other_types_and_runts(self):
+        self.assertIsNone(self.parse(echo_reply(7, icmp_type=mpl.ICMP_ECHO_REQUEST)))
+        self.assertIsNone(self.parse(echo_reply(7)[:6]))
+        self.assertIsNone(self.parse(b''))
+
+
+class SocketPingTest(unittest.TestCase):
+    def setUp(self):
+        self.monitor = mpl.PacketLossMonitor()
+        self.monitor.target_addr = '192.0.2.1'
+        self.out = io.StringIO()
+        for context in (redirect_stdout(self.out), mock.patch.object(mpl, 'PING_INTERVAL', 0.05)):
+            context.__enter__()
+            self.addCleanup(context.__exit__, None, None, None)
+
+    def make_socket(self, **kwargs):
+        sock = FakeSocket(**kwargs)
+        self.addCleanup(sock.close)
+        return sock
+
+    def test_reply_is_counted(self):
+        sock = self.make_socket(respond=answer)
+        self.monitor.ping_once(sock, 0)
+        self.assertEqual((self.monitor.packets_sent, self.monitor.packets_received), (1, 1))
+        self.assertIn("64 bytes from 192.0.2.1: icmp_seq=0 time=", self.out.getvalue())
+        self.assertEqual(self.monitor._outstanding, {})
+
+    def test_foreign_reply_ignored_when_kernel_does_not_filter(self):
+        self.monitor._check_ident = True  # As on macOS
+        sock = self.make_socket()
+        self.monitor.ping_once(sock, 0)
+        sock.deliver(echo_reply(0, (self.monitor.icmp_ident + 1) & 0xffff, ip_header=True))
+        self.monitor.ping_once(sock, 1)
+        self.assertEqual(self.monitor.packets_received, 0)
+        self.assertIn(0, self.monitor._outstanding)
+
+        sock.deliver(echo_reply(0, self.monitor.icmp_ident, ip_header=True))
+        self.monitor.ping_once(sock, 2)
+        self.assertEqual(self.monitor.packets_received, 1)
+        self.assertNotIn(0, self.monitor._outstanding)
+
+    def test_any_identifier_accepted_on_linux(self):
+        # Linux replaces our identifier with the socket's own and filters for us
+        self.monitor._check_ident = False
+        sock = self.make_socket()
+        self.monitor.ping_once(sock, 0)
+        sock.deliver(echo_reply(0, (self.monitor.icmp_ident + 1) & 0xffff))
+        self.monitor.ping_once(sock, 1)
+        self.assertEqual(self.monitor.packets_received, 1)
+
+    def test_request_has_valid_checksum(self):
+        sock = self.make_socket()
+        self.monitor.ping_once(sock, 3)
+        self.assertEqual(mpl.icmp_checksum(sock.sent[0]), 0)
+
+    def test_reply_slower_than_interval_is_credited(self):
+        sock = self.make_socket()
+        self.monitor.ping_once(sock, 0)
+        sock.deliver(echo_reply(0, self.monitor.icmp_ident))
+        self.monitor.ping_once(sock, 1)
+
+        self.assertEqual(self.monitor.packets_received, 1)
+        self.assertGreaterEqual(self.monitor.min_latency, mpl.PING_INTERVAL * 1000)
+        self.assertNotIn("timeout", self.out.getvalue())
+        self.assertEqual(list(self.monitor._outstanding), [1])
+
+    @mock.patch.object(mpl, 'PING_REPLY_TIMEOUT', 0.08)
+    def test_unanswered_request_times_out_once(self):
+        sock = self.make_socket()
+        for seq in range(3):
+            self.monitor.ping_once(sock, seq)
+        self.assertIn("Request timeout for icmp_seq 0", self.out.getvalue())
+
+        # A reply that turns up after the timeout is read but not counted again
+        sock.deliver(echo_reply(0, self.monitor.icmp_ident))
+        self.monitor.wait_for_replies(sock, time.perf_counter_ns() + int(mpl.PING_INTERVAL * 1e9))
+        self.assertEqual(select.select([sock], [], [], 0)[0], [])
+        self.assertEqual(self.monitor.packets_received, 0)
+        self.assertNotIn("icmp_seq=0 time=", self.out.getvalue())
+        self.assertEqual(self.out.getvalue().count("icmp_seq 0"), 1)
+
+    def test_send_error_counts_as_lost(self):
+        sock = self.make_socket(send_error=OSError(errno.ENETUNREACH, "Network is unreachable"))
+        self.monitor.ping_once(sock, 0)
+        self.assertEqual((self.monitor.packets_sent, self.monitor.packets_received), (1, 0))
+        self.assertIn("ping: sendto: Network is unreachable (icmp_seq 0)", self.out.getvalue())
+        self.assertEqual(self.monitor._outstanding, {})
+
+    def test_requests_outstanding_at_exit_count_as_lost(self):
+        def respond(packet):
+            seq = struct.unpack_from('!H', packet, 6)[0]
+            if seq == 3:
+                raise KeyboardInterrupt  # Ctrl+C before the fourth request goes out
+            return answer(packet) if seq == 0 else []
+
+        sock = self.make_socket(respond=respond)
+        with self.assertRaises(KeyboardInterrupt):
+            self.monitor.run_socket(sock)
+
+        self.assertEqual((self.monitor.packets_sent, self.monitor.packets_received), (3, 1))
+        self.assertEqual(self.monitor._outstanding, {})
+        for seq in (1, 2):
+            self.assertIn(f"No reply before exit for icmp_seq {seq}", self.out.getvalue())
+        self.assertEqual(sock._rx.fileno(), -1)
+
+
+LINUX_OUTPUT = [
+    b'PING 8.8.8.8 (8.8.8.8) 56(84) bytes of data.',
+    b'64 bytes from 8.8.8.8: icmp_seq=1 ttl=117 time=12.3 ms',
+    b'From 192.168.1.1 icmp_seq=2 Destination Host Unreachable',
+    b'64 bytes from 8.8.8.8: icmp_seq=3 ttl=117 time=20.5 ms',
+    b'',
+    b'--- 8.8.8.8 ping statistics ---',
+    b'3 packets transmitted, 2 received, +1 errors, 33% packet loss, time 2003ms',
+    b'rtt min/avg/max/mdev = 12.300/16.400/20.500/4.100 ms',
+]
+
+MACOS_OUTPUT = [
+    b'PING 8.8.8.8 (8.8.8.8): 56 data bytes',
+    b'64 bytes from 8.8.8.8: icmp_seq=0 ttl=117 time=9.812 ms\r',
+    b'Request timeout for icmp_seq 1',
+    b'64 bytes from 8.8.8.8: icmp_seq=2 ttl=117 time = 1500.25 ms',
+    b'ping: sendto: No route to host',
+    b'Request timeout for icmp_seq 4',
+    b'',
+    b'--- 8.8.8.8 ping statistics ---',
+    b'5 packets transmitted, 2 packets received, 60.0% packet loss',
+    b'round-trip min/avg/max/stddev = 9.812/755.031/1500.250/745.219 ms',
+]
+
+
+class ProcessLineTest(unittest.TestCase):
+    def setUp(self):
+        self.monitor = mpl.PacketLossMonitor()
+        self.out = io.StringIO()
+
+    def feed(self, lines):
+        with redirect_stdout(self.out):
+            for line in lines:
+                self.monitor._process_line(line)
+
+    def test_linux_output(self):
+        self.feed(LINUX_OUTPUT)
+        self.assertEqual((self.monitor.packets_sent, self.monitor.packets_received), (3, 2))
+        self.assertEqual((self.monitor.min_latency, self.monitor.max_latency), (12.3, 20.5))
+
+    def test_macos_output(self):
+        self.feed(MACOS_OUTPUT)
+        # ping's own sendto error line carries no icmp_seq, so it isn't counted
+        self.assertEqual((self.monitor.packets_sent, self.monitor.packets_received), (4, 2))
+        self.assertEqual((self.monitor.min_latency, self.monitor.max_latency), (9.812, 1500.25))
+
+    def test_every_nonblank_line_is_logged(self):
+        self.feed(LINUX_OUTPUT)
+        logged = self.out.getvalue().splitlines()
+        self.assertEqual(len(logged), len([line for line in LINUX_OUTPUT if line]))
+        self.assertTrue(logged[1].endswith(" - 64 bytes from 8.8.8.8: icmp_seq=1 ttl=117 time=12.3 ms"))
+
+
+class RecordPacketTest(unittest.TestCase):
+    def setUp(self):
+        self.monitor = mpl.PacketLossMonitor()
+        self.out = io.StringIO()
+
+    def test_overall_and_hourly_stats(self):
+        latencies = [10.0, 12.0, None, 30.0, 11.0]
+        with redirect_stdout(self.out):
+            for i, latency in enumerate(latencies):
+                self.monitor.record_packet('2026-01-01 10:00' if i < 3 else '2026-01-01 11:00', latency)
+
+        received = [x for x in latencies if x is not None]
+        self.assertEqual((self.monitor.packets_sent, self.monitor.packets_received), (5, 4))
+        self.assertAlmostEqual(self.monitor.latencies.mean, statistics.mean(received))
+        self.assertAlmostEqual(self.monitor.latencies.stdev(), statistics.stdev(received))
+        self.assertEqual((self.monitor.min_latency, self.monitor.max_latency), (10.0, 30.0))
+
+        hours = self.monitor.hourly_stats
+        self.assertEqual((hours['2026-01-01 10:00']['sent'], hours['2026-01-01 10:00']['received']), (3, 2))
+        self.assertEqual((hours['2026-01-01 11:00']['sent'], hours['2026-01-01 11:00']['received']), (2, 2))
+
+    def test_window_summary_every_100_packets(self):
+        with redirect_stdout(self.out):
+            for i in range(250):
+                self.monitor.record_packet('2026-01-01 10:00', None if i % 10 == 0 else 20.0)
+        output = self.out.getvalue()
+        self.assertEqual(output.count("--- Statistics for packets"), 2)
+        self.assertIn("--- Statistics for packets 101 to 200 ---", output)
+        self.assertIn("Packet loss: 10.00% (10/100 lost)", output)
+        self.assertEqual(self.monitor.max_window_loss_pct, 10.0)
+        self.assertEqual(self.monitor.window_sent, 50)
+
+    def summary(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.monitor.print_summary()
+        return out.getvalue()
+
+    def test_percentiles_in_summary(self):
+        with redirect_stdout(self.out):
+            for latency in range(100, 0, -1):
+                self.monitor.record_packet('2026-01-01 10:00', float(latency))
+            self.monitor.record_packet('2026-01-01 10:00', None)
+        self.assertIn("  Percentiles: p50 50.50 ms, p95 95.05 ms, p99 99.01 ms\n", self.summary())
+
+    def test_percentiles_need_two_samples(self):
+        self.monitor.record_packet('2026-01-01 10:00', 5.0)
+        self.assertIn("  Percentiles: N/A\n", self.summary())
+
+    @mock.patch.object(mpl, 'LATENCY_RESERVOIR_SIZE', 50)
+    def test_reservoir_keeps_fixed_size_sample(self):
+        self.monitor = mpl.PacketLossMonitor()
+        fed = [float(i) for i in range(1000)]
+        with redirect_stdout(self.out), \
+                mock.patch.object(mpl.random, 'randrange', random.Random(0).randrange):
+            for latency in fed:
+                self.monitor.record_packet('2026-01-01 10:00', latency)
+
+        reservoir = list(self.monitor._reservoir)
+        self.assertEqual(self.monitor._reservoir_seen, 1000)
+        self.assertEqual(len(reservoir), 50)
+        # Every slot holds a distinct sampled value, and later samples got in
+        self.assertEqual(len(set(reservoir)), 50)
+        self.assertTrue(set(reservoir) <= set(fed))
+        self.assertGreater(max(reservoir), 50)
+        self.assertIn("Percentiles: p50", self.summary())
+
+
+def fake_ping(script):
+    """Patch run_ping()'s Popen to run script in a child Python instead of ping."""
+    real_popen = subprocess.Popen
+
+    def popen(args, **kwargs):
+        return real_popen([sys.executable, '-c', script], **kwargs)
+    return mock.patch.object(mpl.subprocess, 'Popen', popen)
+
+
+BURSTY_PING = '''
+import sys, time
+out = sys.stdout.buffer
+out.write(b"PING x (x): 56 data bytes\\n64 bytes from x: icmp_seq=0 ttl=1 time=1.5 ms\\n64 bytes from x: icmp_")
+out.flush()
+time.sleep(0.1)
+out.write(b"seq=1 ttl=1 time=2.5 ms\\nRequest timeout for icmp_seq 2\\n"
+          + b"64 bytes from x: icmp_seq=4 ttl=1 time=2.0 ms\\nRequest timeout for icmp_seq 5\\n" * 2)
+out.flush()
+time.sleep(0.1)
+out.write(b"64 bytes from x: icmp_seq=3 ttl=1 time=3.5 ms")
+'''
+
+
+class RunPingTest(unittest.TestCase):
+    def setUp(self):
+        self.monitor = mpl.PacketLossMonitor()
+        self.out = io.StringIO()
+
+    def run_ping(self, script):
+        with fake_ping(script), redirect_stdout(self.out):
+            self.monitor.run_ping()
+        return [line.split(" - ", 1)[1] for line in self.out.getvalue().splitlines() if " - " in line]
+
+    def check_bursty_output(self, lines):
+        self.assertEqual(lines[0], "PING x (x): 56 data bytes")
+        # The line split across two writes comes out whole
+        self.assertEqual(lines[2], "64 bytes from x: icmp_seq=1 ttl=1 time=2.5 ms")
+        # The last line had no newline before ping exited
+        self.assertEqual(lines[-1], "64 bytes from x: icmp_seq=3 ttl=1 time=3.5 ms")
+        self.assertEqual(len(lines), 9)
+        self.assertEqual((self.monitor.packets_sent, self.monitor.packets_received), (8, 5))
+        self.assertEqual((self.monitor.min_latency, self.monitor.max_latency), (1.5, 3.5))
+
+    def test_bursts_partial_lines_and_unterminated_last_line(self):
+        self.check_bursty_output(self.run_ping(BURSTY_PING))
+
+    @mock.patch.object(mpl, 'PING_READ_SIZE', 16)
+    def test_drains_bursts_larger_than_one_read(self):
+        self.check_bursty_output(self.run_ping(BURSTY_PING))
+
+
+    @mock.patch.object(mpl, 'PING_INTERVAL', 0.02)
+    @mock.patch.object(mpl, 'PING_SILENCE_WARNING', 0.3)
+    def test_silence_warnings_repeat_and_reset(self):
+        lines = self.run_ping('''
+import sys, time
+print("64 bytes from x: icmp_seq=0 ttl=1 time=1.0 ms", flush=True)
+time.sleep(0.75)  # Warnings at 0.3s and 0.6s
+print("64 bytes from x: icmp_seq=1 ttl=1 time=1.0 ms", flush=True)
+time.sleep(0.45)  # Counter reset: one warning, at 0.3s
+print("64 bytes from x: icmp_seq=2 ttl=1 time=1.0 ms", flush=True)
+''')
+        replies = [i for i, line in enumerate(lines) if "icmp_seq=" in line]
+        self.assertEqual(len(replies), 3)
+        first_gap = lines[replies[0] + 1:replies[1]]
+        second_gap = lines[replies[1] + 1:replies[2]]
+        self.assertEqual(len(first_gap), 2)
+        self.assertEqual(len(second_gap), 1)
+        for line in first_gap + second_gap:
+            self.assertRegex(line, r"^No output from ping for \d+s$")
+        self.assertEqual(self.monitor.packets_sent, 3)
+
+
+class FallbackTest(unittest.TestCase):
+    def test_no_socket_when_os_refuses(self):
+        monitor = mpl.PacketLossMonitor('127.0.0.1')
+        with mock.patch.object(mpl.socket, 'socket', side_effect=PermissionError(errno.EACCES, "denied")):
+            self.assertIsNone(monitor.open_icmp_socket())
+
+    def test_no_socket_for_ipv6_target(self):
+        self.assertIsNone(mpl.PacketLossMonitor('::1').open_icmp_socket())
+
+    def run_monitor(self, sock):
+        monitor = mpl.PacketLossMonitor()
+        with tempfile.TemporaryDirectory() as tmp:
+            monitor.log_filename = os.path.join(tmp, 'ping.txt')
+            with mock.patch.object(monitor, 'open_icmp_socket', return_value=sock), \
+                    mock.patch.object(monitor, 'run_socket') as run_socket, \
+                    mock.patch.object(monitor, 'run_ping') as run_ping, \
+                    redirect_stdout(io.StringIO()):
+                monitor.run()
+        return run_socket, run_ping
+
+    def test_run_uses_socket_when_available(self):
+        sock = object()
+        run_socket, run_ping = self.run_monitor(sock)
+        run_socket.assert_called_once_with(sock)
+        run_ping.assert_not_called()
+
+    def test_run_falls_back_to_ping(self):
+        run_socket, run_ping = self.run_monitor(None)
+        run_socket.assert_not_called()
+        run_ping.assert_called_once_with()
+
+
+class LogWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.monitor = mpl.PacketLossMonitor()
+        self.monitor.log_filename = os.path.join(self.tmp.name, 'ping.txt')
+
+    def test_lines_reach_file(self):
+        with redirect_stdout(io.StringIO()):
+            self.monitor.open_log()
+            self.monitor.log("first")
+            self.monitor.log("second")
+            self.monitor.close_log()
+        with open(self.monitor.log_filename) as f:
+            self.assertEqual(f.read(), "first\nsecond\n")
+
+    def open_log(self, wrapper):
+        """Open the monitor's log with its file wrapped, as the writer thread sees it."""
+        real_open = open
+        files = []
+
+        def wrapped_open(*args, **kwargs):
+            files.append(wrapper(real_open(*args, **kwargs)))
+            return files[-1]
+        with mock.patch.object(mpl, 'open', wrapped_open, create=True):
+            self.monitor.open_log()
+        return files[0]
+
+    @mock.patch.object(mpl, 'LOG_QUEUE_SIZE', 5)
+    def test_writer_failure_is_raised_and_close_does_not_hang(self):
+        monitor = self.monitor
+        with redirect_stdout(io.StringIO()):
+            self.open_log(FailingFile)
+            monitor.log("kills the writer")
+            monitor._log_thread.join(5)
+            self.assertFalse(monitor._log_thread.is_alive())
+
+            # The writer's error is reported on the main thread...
+            with self.assertRaises(OSError):
+                monitor.log("next line")
+            # ...and later lines are written inline, so they fail loudly too
+            for _ in range(5):
+                with self.assertRaises(OSError):
+                    monitor.log("inline")
+
+            closer = threading.Thread(target=monitor.close_log)
+            closer.start()
+            closer.join(10)
+        self.assertFalse(closer.is_alive(), "close_log() hung")
+        self.assertIsNone(monitor.log_file)
+
+    @mock.patch.object(mpl, 'LOG_QUEUE_SIZE', 2)
+    def test_full_queue_waits_and_keeps_order(self):
+        log_file = self.open_log(GatedFile)
+        threading.Timer(0.2, log_file.gate.set).start()  # Disk stalls, then recovers
+        with redirect_stdout(io.StringIO()):
+            for i in range(10):
+                self.monitor.log(f"line {i}")
+            self.monitor.close_log()
+
+        self.assertEqual(log_file.writers, {self.monitor._log_thread})
+        with open(self.monitor.log_filename) as f:
+            self.assertEqual(f.read().splitlines(), [f"line {i}" for i in range(10)])
+
+    @mock.patch.object(mpl, 'LOG_CLOSE_TIMEOUT', 0.1)
+    def test_close_leaves_file_to_stuck_writer(self):
+        log_file = self.open_log(GatedFile)
+        self.addCleanup(log_file.real.close)
+        stderr = io.StringIO()
+        with redirect_stdout(io.StringIO()), mock.patch.object(mpl.sys, 'stderr', stderr):
+            self.monitor.log("stuck")
+            self.monitor.close_log()
+
+        self.assertIsNone(self.monitor.log_file)
+        self.assertFalse(log_file.closed)
+        self.assertIn("log writer still busy", stderr.getvalue())
+
+        # The writer finishes on its own once the disk recovers
+        log_file.gate.set()
+        self.monitor._log_thread.join(5)
+        self.assertFalse(self.monitor._log_thread.is_alive())
+
+
+class RunTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.monitor = mpl.PacketLossMonitor()
+        self.monitor.log_filename = os.path.join(self.tmp.name, 'ping.txt')
+
+    def test_ctrl_c_prints_summary_once(self):
+        out = io.StringIO()
+        with mock.patch.object(self.monitor, 'open_icmp_socket', return_value=None), \
+                mock.patch.object(self.monitor, 'run_ping', side_effect=KeyboardInterrupt), \
+                redirect_stdout(out):
+            self.monitor.run()
+        self.assertEqual(out.getvalue().count("OVERALL SUMMARY"), 1)
+        self.assertIsNone(self.monitor.log_file)
+        with open(self.monitor.log_filename) as f:
+            self.assertEqual(f.read().count("OVERALL SUMMARY"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()